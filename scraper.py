@@ -2,21 +2,46 @@
 """
 Football Digest Scraper - V4 with Image Extraction
 Extracts images from RSS feeds when available
+
+Performance note: a run is dominated by feed download latency and by
+feedparser, not by our own Python. Don't reach for Numba/Cython here -
+this is string and dict work that JITs can't speed up (Numba falls back
+to object mode and gets slower). Look at the download thread pool, the
+HTTP cache and the feedparser options in parse_feed instead.
 """
 
+import calendar
 import feedparser
 import json
+import os
+import requests
+import requests_cache
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from itertools import islice
+from operator import itemgetter
+from typing import List, Dict, Optional
 from urllib.parse import quote_plus
 import re
 
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# HTTP cache next to this script rather than in the working directory;
+# requests_cache adds the .sqlite suffix
+FEED_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'feed_cache')
+
+# First <img src="..."> in an entry's HTML, used when no media fields are set
+_IMG_SRC_RE = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']')
+
 class FootballDigest:
     def __init__(self):
         self.feeds = [
-            'http://feeds.bbci.co.uk/sport/0/football/rss.xml',
-            'http://www.skysports.com/rss/12040',
+            'https://feeds.bbci.co.uk/sport/0/football/rss.xml',
+            'https://www.skysports.com/rss/12040',
         ]
         
         self.division_keywords = {
@@ -50,108 +75,170 @@ class FootballDigest:
             'boxing', 'ufc', 'nfl', 'nba', 'baseball'
         ]
         
+        self.football_terms = [
+            'football', 'fc', 'goal', 'match', 'premier', 'league',
+            'championship', 'transfer', 'manager'
+        ]
+        
+        self.standout_keywords = [
+            'shock', 'upset', 'stunning', 'comeback', 'record', 'historic',
+            'dramatic', 'derby', 'thriller', 'hat-trick', 'sacked', 'appointed'
+        ]
+        
+        # Each keyword list becomes one compiled alternation, so a check is a
+        # single scan of the text instead of a Python loop of substring tests
+        self._exclude_re = self._keyword_pattern(self.exclude_keywords)
+        self._football_re = self._keyword_pattern(self.football_terms)
+        self._standout_re = self._keyword_pattern(self.standout_keywords)
+        # One pattern per division, kept in priority order
+        self._division_res = {
+            division: self._keyword_pattern(keywords)
+            for division, keywords in self.division_keywords.items()
+        }
+        
+        # Created on first use by get_session()
+        self.session = None
+        
+    @staticmethod
+    def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+        """Compile keywords into a pattern matching any of them as a substring"""
+        return re.compile('|'.join(map(re.escape, keywords)))
+    
     def extract_image_from_entry(self, entry) -> str:
         """Extract image URL from RSS entry"""
-        try:
-            # Try different RSS image fields
-            # Method 1: media:thumbnail
-            if hasattr(entry, 'media_thumbnail') and entry.media_thumbnail:
-                return entry.media_thumbnail[0].get('url', '')
-            
-            # Method 2: media:content
-            if hasattr(entry, 'media_content') and entry.media_content:
-                return entry.media_content[0].get('url', '')
-            
-            # Method 3: enclosures
-            if hasattr(entry, 'enclosures') and entry.enclosures:
-                for enclosure in entry.enclosures:
-                    if 'image' in enclosure.get('type', ''):
-                        return enclosure.get('href', '')
-            
-            # Method 4: Look in content/summary for img tags
-            content = entry.get('summary', '') + entry.get('content', [{}])[0].get('value', '')
-            img_match = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', content)
+        # Try different RSS image fields
+        # Method 1: media:thumbnail
+        media_thumbnail = entry.get('media_thumbnail')
+        if media_thumbnail:
+            return media_thumbnail[0].get('url', '')
+        
+        # Method 2: media:content
+        media_content = entry.get('media_content')
+        if media_content:
+            return media_content[0].get('url', '')
+        
+        # Method 3: enclosures
+        for enclosure in entry.get('enclosures') or ():
+            if 'image' in enclosure.get('type', ''):
+                return enclosure.get('href', '')
+        
+        # Method 4: Look in summary/content for img tags. Most summaries are
+        # plain text, so a substring check skips the regex when it can't match
+        summary = entry.get('summary', '')
+        if '<img' in summary:
+            img_match = _IMG_SRC_RE.search(summary)
             if img_match:
                 return img_match.group(1)
-            
-            return ''
-        except Exception as e:
-            print(f"Error extracting image: {e}")
-            return ''
+        
+        content_list = entry.get('content')
+        if content_list:
+            content = content_list[0].get('value', '')
+            if '<img' in content:
+                img_match = _IMG_SRC_RE.search(content)
+                if img_match:
+                    return img_match.group(1)
+        
+        return ''
     
-    def is_football_article(self, title: str, summary: str) -> bool:
-        """Check if article is about football"""
-        try:
-            text = (title + ' ' + summary).lower()
-            
-            for keyword in self.exclude_keywords:
-                if keyword in text:
-                    return False
-            
-            football_terms = ['football', 'fc', 'goal', 'match', 'premier', 'league', 
-                             'championship', 'transfer', 'manager']
-            
-            return any(term in text for term in football_terms)
-        except Exception as e:
-            print(f"Error checking if football article: {e}")
+    def is_football_article(self, text_lower: str) -> bool:
+        """Check if article is about football, given its lowercased title + summary"""
+        if self._exclude_re.search(text_lower):
             return False
+        
+        return self._football_re.search(text_lower) is not None
+    
+    def categorize_article(self, text_lower: str) -> str:
+        """Determine division from the lowercased title + summary"""
+        for division, pattern in self._division_res.items():
+            if pattern.search(text_lower):
+                return division
+        
+        return 'premier_league'
+    
+    def get_session(self) -> requests.Session:
+        """Return the shared HTTP session, opening its on-disk cache on first use"""
+        if self.session is None:
+            # Re-runs within half an hour skip the network, and stale entries
+            # are revalidated with ETag/Last-Modified (304, no body). CI only
+            # benefits because the workflow restores FEED_CACHE between runs
+            self.session = requests_cache.CachedSession(FEED_CACHE, expire_after=1800)
+            self.session.headers['User-Agent'] = 'football-digest/1.0'
+        return self.session
     
-    def categorize_article(self, title: str, summary: str) -> str:
-        """Determine division"""
+    def download_feed(self, url: str) -> Optional[requests.Response]:
+        """Download a feed; only does network I/O so it can run on a worker thread"""
         try:
-            text = (title + ' ' + summary).lower()
-            
-            for division, keywords in self.division_keywords.items():
-                for keyword in keywords:
-                    if keyword in text:
-                        return division
-            
-            return 'premier_league'
+            print(f"Fetching: {url}")
+            response = self.get_session().get(url, timeout=10)
+            response.raise_for_status()
+            return response
         except Exception as e:
-            print(f"Error categorizing article: {e}")
-            return 'premier_league'
+            print(f"ERROR fetching {url}: {e}")
+            return None
     
-    def fetch_feed(self, url: str) -> List[Dict]:
-        """Fetch RSS feed with error handling and image extraction"""
+    def parse_feed(self, url: str, response: requests.Response) -> List[Dict]:
+        """Parse a downloaded feed into football articles with images"""
         try:
-            print(f"Fetching: {url}")
-            feed = feedparser.parse(url)
+            # Only plain fields are read from entries, so skip feedparser's
+            # per-entry HTML sanitising and relative-URI rewriting.
+            # feedparser looks headers up by lowercase name, so the declared
+            # charset is only seen if the keys are lowercased first
+            feed = feedparser.parse(
+                response.content,
+                response_headers={k.lower(): v for k, v in response.headers.items()},
+                sanitize_html=False,
+                resolve_relative_uris=False,
+            )
             
             if not feed.entries:
                 print(f"Warning: No entries found in {url}")
                 return []
             
             articles = []
-            cutoff_date = datetime.now() - timedelta(days=7)
+            now = datetime.now()
+            today = f"{now.year:04d}-{now.month:02d}-{now.day:02d}"
+            # published_parsed is a UTC struct_time, so compare epoch seconds
+            cutoff_ts = (now - timedelta(days=7)).timestamp()
             
-            for entry in feed.entries[:50]:
+            # Looked up once rather than on every pass of the entry loop
+            timegm = calendar.timegm
+            is_football_article = self.is_football_article
+            extract_image = self.extract_image_from_entry
+            categorize_article = self.categorize_article
+            append = articles.append
+            
+            for entry in islice(feed.entries, 50):
                 try:
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        pub_date = datetime(*entry.published_parsed[:6])
+                    published_parsed = entry.get('published_parsed')
+                    if published_parsed:
+                        # Not a break: feeds re-surface updated stories out of date order
+                        if timegm(published_parsed) < cutoff_ts:
+                            continue
+                        published = f"{published_parsed.tm_year:04d}-{published_parsed.tm_mon:02d}-{published_parsed.tm_mday:02d}"
                     else:
-                        pub_date = datetime.now()
-                    
-                    if pub_date < cutoff_date:
-                        continue
+                        published = today
                     
                     title = entry.get('title', 'No title')
                     summary = entry.get('summary', entry.get('description', ''))
+                    # Lowercased once here and reused by every keyword check
+                    text_lower = (title + ' ' + summary).lower()
                     
-                    if not self.is_football_article(title, summary):
+                    if not is_football_article(text_lower):
                         continue
                     
                     # Extract image
-                    image_url = self.extract_image_from_entry(entry)
+                    image_url = extract_image(entry)
                     
                     article = {
                         'title': title,
                         'link': entry.get('link', '#'),
-                        'published': pub_date.strftime('%Y-%m-%d'),
+                        'published': published,
                         'summary': summary[:200] + '...' if len(summary) > 200 else summary,
-                        'division': self.categorize_article(title, summary),
-                        'image': image_url  # Add image URL
+                        'division': categorize_article(text_lower),
+                        'image': image_url,  # Add image URL
+                        '_text_lower': text_lower  # Dropped before saving
                     }
-                    articles.append(article)
+                    append(article)
                     
                 except Exception as e:
                     print(f"Error parsing entry: {e}")
@@ -161,9 +248,16 @@ class FootballDigest:
             return articles
             
         except Exception as e:
-            print(f"ERROR fetching {url}: {e}")
+            print(f"ERROR parsing {url}: {e}")
             return []
     
+    def fetch_feed(self, url: str) -> List[Dict]:
+        """Fetch RSS feed with error handling and image extraction"""
+        response = self.download_feed(url)
+        if response is None:
+            return []
+        return self.parse_feed(url, response)
+    
     def fetch_youtube_highlights(self, query: str) -> List[Dict]:
         """Generate YouTube link"""
         try:
@@ -180,26 +274,18 @@ class FootballDigest:
     def categorize_standout_moments(self, articles: List[Dict]) -> List[Dict]:
         """Find standout moments"""
         try:
-            standout_keywords = [
-                'shock', 'upset', 'stunning', 'comeback', 'record', 'historic',
-                'dramatic', 'derby', 'thriller', 'hat-trick', 'sacked', 'appointed'
-            ]
-            
             standout_moments = []
             
             for article in articles:
-                title_lower = article['title'].lower()
-                summary_lower = article.get('summary', '').lower()
-                
-                for keyword in standout_keywords:
-                    if keyword in title_lower or keyword in summary_lower:
-                        standout_moments.append({
-                            'moment': article['title'],
-                            'link': article['link']
-                        })
+                if self._standout_re.search(article['_text_lower']):
+                    standout_moments.append({
+                        'moment': article['title'],
+                        'link': article['link']
+                    })
+                    if len(standout_moments) == 15:
                         break
             
-            return standout_moments[:15]
+            return standout_moments
             
         except Exception as e:
             print(f"Error finding standout moments: {e}")
@@ -212,9 +298,10 @@ class FootballDigest:
             print("Football Digest Generator v4 (with Images)")
             print("="*60 + "\n")
             
+            now = datetime.now()
             digest = {
-                'generated_date': datetime.now().strftime('%Y-%m-%d'),
-                'week_ending': datetime.now().strftime('%B %d, %Y'),
+                'generated_date': now.strftime('%Y-%m-%d'),
+                'week_ending': now.strftime('%B %d, %Y'),
                 'divisions': {}
             }
             
@@ -234,9 +321,27 @@ class FootballDigest:
                 }
             
             all_articles = []
-            for feed_url in self.feeds:
-                articles = self.fetch_feed(feed_url)
-                all_articles.extend(articles)
+            # Duplicates are keyed by link, and by title for syndicated copies
+            seen_titles = set()
+            seen_links = set()
+            # Opened before the pool starts so the download threads share it
+            self.get_session()
+            # Feeds download concurrently; parsing stays on this thread, in feed order
+            with ThreadPoolExecutor(max_workers=len(self.feeds)) as executor:
+                responses = executor.map(self.download_feed, self.feeds)
+                for feed_url, response in zip(self.feeds, responses):
+                    if response is None:
+                        continue
+                    for article in self.parse_feed(feed_url, response):
+                        title_key = article['title'].strip().lower()
+                        link = article['link']
+                        if title_key in seen_titles or link in seen_links:
+                            continue
+                        seen_titles.add(title_key)
+                        # '#' is the placeholder for entries without a link
+                        if link != '#':
+                            seen_links.add(link)
+                        all_articles.append(article)
             
             print(f"\nTotal football articles found: {len(all_articles)}")
             
@@ -244,31 +349,27 @@ class FootballDigest:
             articles_with_images = sum(1 for a in all_articles if a.get('image'))
             print(f"Articles with images: {articles_with_images}")
             
-            for article in all_articles:
+            # One stable sort up front leaves every division newest-first;
+            # all_articles itself keeps feed order for the standout picks
+            for article in sorted(all_articles, key=itemgetter('published'), reverse=True):
                 division = article.pop('division')
                 if division in digest['divisions']:
                     digest['divisions'][division]['articles'].append(article)
             
             for div_key in digest['divisions']:
                 articles = digest['divisions'][div_key]['articles']
+                digest['divisions'][div_key]['articles'] = articles[:15]
                 
-                seen_titles = set()
-                unique_articles = []
-                for article in articles:
-                    if article['title'] not in seen_titles:
-                        seen_titles.add(article['title'])
-                        unique_articles.append(article)
-                
-                unique_articles.sort(key=lambda x: x['published'], reverse=True)
-                digest['divisions'][div_key]['articles'] = unique_articles[:15]
-                
-                count = len(unique_articles)
-                images = sum(1 for a in unique_articles if a.get('image'))
+                count = len(articles)
+                images = sum(1 for a in articles if a.get('image'))
                 print(f"{digest['divisions'][div_key]['name']}: {count} articles ({images} with images)")
             
             digest['standout_moments'] = self.categorize_standout_moments(all_articles)
             print(f"Standout moments: {len(digest['standout_moments'])}")
             
+            for article in all_articles:
+                del article['_text_lower']
+            
             print("\n" + "="*60)
             return digest
             
@@ -285,8 +386,13 @@ def main():
         digest = scraper.generate_digest()
         
         output_file = 'digest_data.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(digest, indent=2, fp=f)
+        if orjson is not None:
+            data = orjson.dumps(digest, option=orjson.OPT_INDENT_2)
+        else:
+            # ensure_ascii=False matches orjson's raw UTF-8 byte for byte
+            data = json.dumps(digest, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(output_file, 'wb') as f:
+            f.write(data)
         
         print(f"✅ SUCCESS! Saved to {output_file}\n")
         return 0
@@ -0,0 +1,61 @@
+// Carousels are not needed for first paint, so wire them up once the browser is idle
+function initCarousels() {
+    // Carousel functionality
+    document.querySelectorAll('.prev-btn, .next-btn').forEach(btn => {
+        btn.addEventListener('click', function() {
+            const division = this.dataset.division;
+            const carousel = document.getElementById(`carousel-${division}`);
+            const track = carousel.querySelector('.carousel-track');
+            const cardWidth = track.querySelector('.carousel-card, .no-news-card')?.offsetWidth || 350;
+            const gap = 32;
+            const scrollAmount = cardWidth + gap;
+
+            const currentScroll = track.style.transform ?
+                parseInt(track.style.transform.replace('translateX(', '').replace('px)', '')) : 0;
+
+            let newScroll;
+            if (this.classList.contains('next-btn')) {
+                newScroll = currentScroll - scrollAmount;
+            } else {
+                newScroll = currentScroll + scrollAmount;
+            }
+
+            const maxScroll = -(track.scrollWidth - carousel.offsetWidth);
+            newScroll = Math.max(maxScroll, Math.min(0, newScroll));
+
+            track.style.transform = `translateX(${newScroll}px)`;
+        });
+    });
+
+    // Touch/swipe support
+    document.querySelectorAll('.carousel-track').forEach(track => {
+        let startX = 0;
+        let currentTranslate = 0;
+        let prevTranslate = 0;
+        let isDragging = false;
+
+        track.addEventListener('touchstart', (e) => {
+            startX = e.touches[0].clientX;
+            isDragging = true;
+            const transform = track.style.transform;
+            prevTranslate = transform ? parseInt(transform.replace('translateX(', '').replace('px)', '')) : 0;
+        });
+
+        track.addEventListener('touchmove', (e) => {
+            if (!isDragging) return;
+            const currentX = e.touches[0].clientX;
+            currentTranslate = prevTranslate + (currentX - startX);
+            track.style.transform = `translateX(${currentTranslate}px)`;
+        });
+
+        track.addEventListener('touchend', () => {
+            isDragging = false;
+        });
+    });
+}
+
+if ('requestIdleCallback' in window) {
+    requestIdleCallback(initCarousels, { timeout: 2000 });
+} else {
+    setTimeout(initCarousels, 1);
+}